@@ -1,40 +1,86 @@
+import asyncio
 import os
 from asyncio import Event
-from itertools import count
-from typing import TypeVar
+from typing import Tuple, TypeVar
 
 from prompt_toolkit.application import get_app
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.document import Document
+from prompt_toolkit.eventloop import run_in_executor_with_context
 from prompt_toolkit.lexers import SimpleLexer
 from sansio_lsp_client import DiagnosticSeverity, PublishDiagnostics
 
 from sno_py.lexer import FileLexer
+from sno_py.lsp.client import path_to_uri
 from sno_py.lsp.completion import LanguageCompleter
 from sno_py.lsp.diagnostic import Diagnostic
 
 SnooBuffer = TypeVar("SnooBuffer")
 
+_LSP_CHANGE_DELAY = 0.1
+_DEBUG_SYNC_DELAY = 0.05
+_EMPTY_DOCUMENT = Document("", 0)
+
+
+def _read_file(path: str) -> Tuple[bytes, bool]:
+    try:
+        with open(path, "r+b") as f:
+            return f.read(), False
+    except PermissionError:
+        with open(path, "rb") as f:
+            return f.read(), True
+
+
+def _write_file(path: str, text: str, encoding: str) -> None:
+    with open(path, "w", encoding=encoding) as f:
+        f.write(text)
+
 
 class FileBuffer:
+    __slots__ = (
+        "_editor",
+        "_path",
+        "_name",
+        "_encoding",
+        "_read_only",
+        "_index",
+        "_changes",
+        "_saved_changes",
+        "_filetype",
+        "_lsp_client",
+        "_synced_text",
+        "_version",
+        "_buffer",
+        "_lexer",
+        "_reports",
+        "_reports_hash",
+        "_report_task",
+        "_pending_change",
+        "_cancelation_token",
+    )
+
     def __init__(self, editor, path, encoding: str = "UTF-8") -> None:
         self._editor = editor
-        self._path = os.path.abspath(path)
+        self._path = os.path.normpath(os.path.join(editor.cwd, path))
         self._name = os.path.basename(path)
-        self._encoding = encoding
+        # Reads and writes must agree; open() would otherwise fall back to the
+        # locale encoding on save.
+        self._encoding = encoding or "utf-8"
         self._read_only = False
 
         self._index = len(self._editor.buffers) - 1 if self._editor.buffers else 0
 
-        self._text = ""
+        self._changes = self._saved_changes = 0
 
+        self._filetype = None
         self._lsp_client = None
+        self._synced_text = None
 
-        self._version = count()
+        self._version = 1
 
         self._buffer = Buffer(
             multiline=True,
-            document=Document(self._text, 0),
+            document=_EMPTY_DOCUMENT,
             read_only=self._read_only,
             completer=LanguageCompleter(self._editor, self._path),
             complete_while_typing=True,
@@ -43,7 +89,9 @@ class FileBuffer:
 
         self._lexer = FileLexer(self._editor, self._path)
         self._reports = Diagnostic()
+        self._reports_hash = None
         self._report_task = None
+        self._pending_change = None
         self._cancelation_token = Event()
 
     @property
@@ -56,7 +104,7 @@ class FileBuffer:
 
     @property
     def content(self) -> str:
-        return self._text
+        return self._buffer.text
 
     @property
     def path(self) -> str:
@@ -83,9 +131,13 @@ class FileBuffer:
     def index(self) -> int:
         return self._index
 
+    @index.setter
+    def index(self, index: int) -> None:
+        self._index = index
+
     @property
     def saved(self) -> bool:
-        return self._text == self._buffer.text
+        return self._changes == self._saved_changes
 
     @property
     def read_only(self) -> bool:
@@ -95,51 +147,67 @@ class FileBuffer:
         self._init_lsp_client()
 
     async def unfocus(self) -> None:
-        if self._lsp_client is None:
-            self._lsp_client = await self._editor.lsp.get_server()
-
+        if self._lsp_client is not None:
+            self._cancel_document_change()
             self._lsp_client.close_document(self._path)
             self._lsp_client.remove_notification_handler(
                 of_type=PublishDiagnostics, func=self.listen_for_reports
             )
+            self._lsp_client = None
 
     async def save(self) -> bool:
         if self._lsp_client is not None:
+            self._flush_document_change()
             self._lsp_client.save_document(self._path)
         if self._read_only:
             return False
-        with open(self._path, "w", encoding=self._encoding) as f:
-            self._text = self._buffer.text
-            f.write(self._buffer.text)
-            return True
+        text = self._buffer.text
+        changes = self._changes
+        await run_in_executor_with_context(
+            _write_file, self._path, text, self._encoding
+        )
+        self._saved_changes = changes
+        return True
 
     async def load(self) -> None:
         if not self._is_new:
-            try:
-                with open(self._path, "r+") as f:
-                    self._text = f.read()
-                    self._buffer.text = self._text
-            except PermissionError:
-                self._read_only = True
-                with open(self._path, "r") as f:
-                    self._text = f.read()
-                    self._buffer.text = self._text
+            data, self._read_only = await run_in_executor_with_context(
+                _read_file, self._path
+            )
+            self._buffer.text = self._decode(data)
+            self._saved_changes = self._changes
 
         self._init_lsp_client()
 
+    def _decode(self, data: bytes) -> str:
+        try:
+            text = data.decode(self._encoding)
+        except UnicodeDecodeError:
+            # Latin-1 maps every byte, so saving writes the same bytes back.
+            self._encoding = "latin-1"
+            text = data.decode(self._encoding)
+        # Match the universal newlines translation of text mode reads.
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
     def _init_lsp_client(self):
         async def _init_lsp_client_real():
+            if self._lsp_client is not None:
+                return
             if (
-                lsp_client := await self._editor.lsp.get_client(self._path, os.getcwd())
-            ) is not None:
-                self._lsp_client = lsp_client
-                self._lsp_client.open_document(
-                    self._editor.filetype.guess_filetype(
-                        self._path, self._buffer.document.text
-                    ),
-                    self._path,
-                    self._text,
+                lsp_client := await self._editor.lsp.get_client(
+                    self._path, self._editor.cwd
                 )
+            ) is not None and self._lsp_client is None:
+                self._lsp_client = lsp_client
+                text = self._buffer.text
+                if self._filetype is None:
+                    self._filetype = self._editor.filetype.guess_filetype(
+                        self._path, text
+                    )
+                self._lsp_client.open_document(self._filetype, self._path, text)
+                self._synced_text = text
                 self._lsp_client.add_notification_handler(
                     of_type=PublishDiagnostics, func=self.listen_for_reports
                 )
@@ -147,6 +215,7 @@ class FileBuffer:
         return get_app().create_background_task(_init_lsp_client_real())
 
     async def close(self):
+        self._cancel_document_change()
         if self._lsp_client is not None:
             self._lsp_client.close_document(self._path)
 
@@ -162,36 +231,88 @@ class FileBuffer:
     async def on_focus() -> None:
         pass
 
-    def reindex(self):
-        for i, buffer in enumerate(self._editor.buffers):
-            if buffer == self:
-                self._index = i
-
     @property
     def buffer_inst(self) -> Buffer:
         return self._buffer
 
-    def _on_text_changed(self, _):
+    def _on_text_changed(self, _: Buffer) -> None:
+        self._changes += 1
+        if self._lsp_client is not None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Edits made by :! scripts arrive on an executor thread.
+                get_app().loop.call_soon_threadsafe(self._schedule_document_change)
+            else:
+                self._schedule_document_change()
+
+    def _schedule_document_change(self) -> None:
+        self._cancel_document_change()
+        self._pending_change = asyncio.get_running_loop().call_later(
+            _LSP_CHANGE_DELAY, self._flush_document_change
+        )
+
+    def _flush_document_change(self) -> None:
+        if self._pending_change is not None:
+            self._cancel_document_change()
+            self._notify_document_change()
+
+    def _cancel_document_change(self) -> None:
+        if self._pending_change is not None:
+            self._pending_change.cancel()
+            self._pending_change = None
+
+    def _notify_document_change(self) -> None:
         if self._lsp_client is not None:
+            text = self._buffer.text
+            self._version += 1
             self._lsp_client.change_document(
                 self._path,
-                version=next(self._version),
-                text=self._buffer.text,
+                version=self._version,
+                text=text,
                 want_diagnostics=True,
+                previous_text=self._synced_text,
             )
+            self._synced_text = text
 
     async def listen_for_reports(self, ev):
-        if self._lsp_client is not None:
-            with self._reports:
-                for diagnostic in ev.diagnostics:
-                    if diagnostic.severity == DiagnosticSeverity.ERROR:
-                        self._reports.append(diagnostic)
+        if self._lsp_client is not None and ev.uri == path_to_uri(self._path):
+            errors = [
+                diagnostic
+                for diagnostic in ev.diagnostics
+                if diagnostic.severity == DiagnosticSeverity.ERROR
+            ]
+            reports_hash = hash(
+                tuple(
+                    (
+                        diagnostic.range.start.line,
+                        diagnostic.range.start.character,
+                        diagnostic.range.end.line,
+                        diagnostic.range.end.character,
+                        diagnostic.message,
+                    )
+                    for diagnostic in errors
+                )
+            )
+            if reports_hash == self._reports_hash:
+                return
+            self._reports_hash = reports_hash
+            self._reports.replace_all(errors)
 
-    def reports(self):
+    def reports(self) -> list:
         return self._reports.get_diagnostics()
 
+    def reports_at(self, line: int) -> list:
+        return self._reports.get_line_diagnostics(line)
+
+    @property
+    def reports_version(self) -> int:
+        return self._reports.version
+
 
 class DebugBuffer(FileBuffer):
+    __slots__ = ("_chunks", "_text", "_sync_handle")
+
     def __init__(self, editor) -> None:
         self._editor = editor
         self._path = "*debug*"
@@ -202,11 +323,13 @@ class DebugBuffer(FileBuffer):
 
         self._index = -1
 
+        self._chunks = []
         self._text = ""
+        self._sync_handle = None
 
         self._buffer = Buffer(
             multiline=True,
-            document=Document(self._text, 0),
+            document=_EMPTY_DOCUMENT,
             read_only=False,
             on_text_changed=self._on_text_changed,
         )
@@ -215,6 +338,10 @@ class DebugBuffer(FileBuffer):
     def _is_new(self) -> bool:
         return True
 
+    @property
+    def saved(self) -> bool:
+        return True
+
     async def focus(self) -> None:
         return
 
@@ -230,23 +357,50 @@ class DebugBuffer(FileBuffer):
     async def close(self) -> None:
         return
 
+    @property
+    def content(self) -> str:
+        return self._text
+
     def write(self, text: str) -> None:
-        self._text += text + "\n"
-        self._buffer.text = self._text
+        self._chunks.append(text)
+        self._chunks.append("\n")
+        if self._sync_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._sync()
+            else:
+                self._sync_handle = loop.call_later(_DEBUG_SYNC_DELAY, self._sync)
 
     def clear(self) -> None:
-        self._text = ""
+        self._chunks.clear()
+        self._sync()
+
+    def _sync(self) -> None:
+        if self._sync_handle is not None:
+            self._sync_handle.cancel()
+            self._sync_handle = None
+        self._text = "".join(self._chunks)
         self._buffer.text = self._text
 
-    def _on_text_changed(self, _):
+    def _on_text_changed(self, _: Buffer) -> None:
         if self._buffer.document.text != self._text:
             self._buffer.text = self._text
 
     def reports(self) -> list:
         return []
 
+    def reports_at(self, line: int) -> list:
+        return []
+
+    @property
+    def reports_version(self) -> int:
+        return 0
+
 
 class LogBuffer(DebugBuffer):
+    __slots__ = ()
+
     def __init__(self, editor) -> None:
         super().__init__(editor)
         self._name = ""
@@ -1,12 +1,15 @@
 import colorsys
+from functools import lru_cache
 
 
+@lru_cache(maxsize=512)
 def adjust_color_brightness(hex_color: str, factor: float) -> str:
-    hex_color = hex_color.lstrip("#")
-    rgb = tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
-    hue, light, sat = colorsys.rgb_to_hls(*[x / 255.0 for x in rgb])
-    light = max(min(light * factor, 1.0), 0.0)
-    rgb = colorsys.hls_to_rgb(hue, light, sat)
-    return "#{:02x}{:02x}{:02x}".format(
-        int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255)
+    value = int(hex_color.lstrip("#"), 16)
+    hue, light, sat = colorsys.rgb_to_hls(
+        ((value >> 16) & 0xFF) / 255.0,
+        ((value >> 8) & 0xFF) / 255.0,
+        (value & 0xFF) / 255.0,
     )
+    light = max(min(light * factor, 1.0), 0.0)
+    red, green, blue = colorsys.hls_to_rgb(hue, light, sat)
+    return f"#{int(red * 255) << 16 | int(green * 255) << 8 | int(blue * 255):06x}"
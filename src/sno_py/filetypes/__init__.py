@@ -1,37 +1,139 @@
 import os
 import re
-from typing import Literal, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Literal, Pattern, Union
 
 from sno_py.filetypes.defaults import filetype_defaults
 from sno_py.fonts_utils import get_language_icon
+from sno_py.singleton import singleton
 
+_CONTENT_LIMIT = 8192
+_EXTENSION_PATTERN = re.compile(r"\.\*(?:\\\.|\[\.\])\(?(\w+(?:\|\w+)*)\)?\$?")
 
+
+def _compile(pattern, flags: int = 0):
+    if isinstance(pattern, list):
+        return [re.compile(p, flags) for p in pattern]
+    return re.compile(pattern, flags)
+
+
+def _as_list(pattern) -> list:
+    if pattern is None:
+        return []
+    return pattern if isinstance(pattern, list) else [pattern]
+
+
+def _pattern_extensions(pattern):
+    if not isinstance(pattern, str):
+        return None
+    match = _EXTENSION_PATTERN.fullmatch(pattern)
+    return match.group(1).split("|") if match else None
+
+
+@dataclass(frozen=True, slots=True)
+class _FileTypeEntry:
+    name: str
+    pattern: Union[Pattern, List[Pattern], None]
+    file_pattern: Union[Pattern, List[Pattern], None]
+
+
+@singleton
 class FileType:
     def __init__(self) -> None:
-        self.defaults = filetype_defaults
+        self._entries: List[_FileTypeEntry] = []
+        self._by_extension = {}
+        self._longest_extension = 0
+        self._complex = []
+        self._complex_patterns = []
+        for entry in filetype_defaults:
+            self._add_entry(entry)
+        self._update_complex_pattern()
 
-    def guess_filetype(self, file_path, content) -> Union[str, Literal["file"]]:
-        filename = os.path.basename(file_path)
+        # The status bar and the tree menu ask for the same paths on every
+        # redraw. Guesses are keyed on the head of the content only, so edits
+        # below it still hit and no full copy of the buffer is kept alive.
+        self._filename_matches = lru_cache(maxsize=512)(self._match_filename)
+        self._guess = lru_cache(maxsize=32)(self._guess_filetype)
+
+    def _add_entry(self, entry: dict) -> None:
+        for filetype, patterns in entry.items():
+            self._add_filetype_entry(
+                filetype, patterns.get("pattern"), patterns.get("file_pattern")
+            )
 
+    def _add_filetype_entry(self, filetype, pattern, file_pattern) -> None:
+        index = len(self._entries)
+        self._entries.append(
+            _FileTypeEntry(
+                filetype,
+                None if pattern is None else _compile(pattern),
+                # Content patterns anchor on lines, not on the start of the text.
+                None if file_pattern is None else _compile(file_pattern, re.MULTILINE),
+            )
+        )
+
+        extensions = _pattern_extensions(pattern)
+        if extensions is None:
+            self._complex.append(index)
+            self._complex_patterns.extend(_as_list(pattern))
+            return
+        for extension in extensions:
+            self._by_extension.setdefault(extension, []).append(index)
+            self._longest_extension = max(self._longest_extension, len(extension))
+
+    def _update_complex_pattern(self) -> None:
+        # One search over the alternation tells whether any of the irregular
+        # patterns can match, so most filenames skip them all at once.
+        try:
+            self._complex_pattern = re.compile(
+                "|".join(f"(?:{pattern})" for pattern in self._complex_patterns)
+            )
+        except re.error:
+            self._complex_pattern = None
+
+    def _candidates(self, filename: str) -> list:
+        if self._complex_pattern is None or self._complex_pattern.search(filename):
+            candidates = set(self._complex)
+        else:
+            candidates = set()
+        # Plain extension patterns can only match when one of their extensions
+        # starts a dot-separated segment of the filename.
+        by_extension = self._by_extension
+        for segment in filename.split(".")[1:]:
+            for end in range(1, min(len(segment), self._longest_extension) + 1):
+                candidates.update(by_extension.get(segment[:end], ()))
+        return sorted(candidates)
+
+    def _match_filename(self, filename: str) -> tuple:
         extension_matches = []
 
-        for entry in self.defaults:
-            for filetype, patterns in entry.items():
-                filename_score = self._calculate_score(
-                    patterns.get("pattern"), filename
-                )
-                if filename_score > 0:
-                    extension_matches.append((filetype, patterns, filename_score))
+        entries = self._entries
+        for index in self._candidates(filename):
+            entry = entries[index]
+            filename_score = self._calculate_score(entry.pattern, filename)
+            if filename_score > 0:
+                extension_matches.append((entry, filename_score))
+        return tuple(extension_matches)
+
+    def guess_filetype(self, file_path, content) -> Union[str, Literal["file"]]:
+        # Content patterns look for signatures near the top of the file.
+        return self._guess(file_path, content[:_CONTENT_LIMIT])
+
+    def _guess_filetype(self, file_path, content) -> Union[str, Literal["file"]]:
+        extension_matches = self._filename_matches(os.path.basename(file_path))
         if not extension_matches:
             return "file"
+        if len(extension_matches) == 1:
+            return extension_matches[0][0].name
 
         content_scores = []
-        for filetype, patterns, filename_score in extension_matches:
-            if "file_pattern" in patterns:
-                content_score = self._calculate_score(patterns["file_pattern"], content)
-                content_scores.append((filetype, content_score, filename_score))
+        for entry, filename_score in extension_matches:
+            if entry.file_pattern is not None:
+                content_score = self._calculate_score(entry.file_pattern, content)
+                content_scores.append((entry.name, content_score, filename_score))
             else:
-                content_scores.append((filetype, 0.1, filename_score))
+                content_scores.append((entry.name, 0.1, filename_score))
 
         sorted_scores = sorted(content_scores, key=lambda x: (x[1], x[2]), reverse=True)
 
@@ -42,24 +144,19 @@ class FileType:
         filetype = self.guess_filetype(file_path, content)
         return get_language_icon(filetype)
 
-    @classmethod
-    def add_filetype(cls, filetype, filename_pattern, content_pattern=None):
-        new_filetype = {
-            filetype: {
-                "pattern": filename_pattern,
-            }
-        }
-
-        if content_pattern:
-            new_filetype[filetype]["file_pattern"] = content_pattern
-
-        cls.defaults.append(new_filetype)
+    def add_filetype(self, filetype, filename_pattern, content_pattern=None):
+        self._add_filetype_entry(filetype, filename_pattern, content_pattern or None)
+        self._update_complex_pattern()
+        self._filename_matches.cache_clear()
+        self._guess.cache_clear()
 
     @classmethod
-    def _calculate_score(self, pattern, target) -> int:
+    def _calculate_score(
+        self, pattern: Union[Pattern, List[Pattern], None], target
+    ) -> int:
         if pattern is None or not target:
             return 0
         if isinstance(pattern, list):
-            return max(FileType._calculate_score(p, target) for p in pattern)
-        match = re.search(pattern, target)
-        return len(match.group()) if match else 0
+            return max(self._calculate_score(p, target) for p in pattern)
+        match = pattern.search(target)
+        return match.end() - match.start() if match else 0
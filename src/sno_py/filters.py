@@ -9,38 +9,29 @@ class Filters:
         self._is_tree_menu_toggled = False
         self._is_terminal_toggled = False
 
+        command_buffer = editor.command_buffer
+        log_buffer = editor.log_buffer
+        vi_buffers = (editor.search_buffer, command_buffer, log_buffer)
+
         class _Conditions:
             @Condition
             def vi_buffer_focused() -> bool:
-                app = get_app()
-                if (
-                    app.layout.has_focus(self._editor.search_buffer)
-                    or app.layout.has_focus(self._editor.command_buffer)
-                    or app.layout.has_focus(self._editor.log_buffer)
-                ):
-                    return True
-                return False
+                return get_app().current_buffer in vi_buffers
 
             @Condition
-            def vi_log_focused():
-                app = get_app()
-                return _Conditions.vi_buffer_focused() and app.layout.has_focus(
-                    self._editor.log_buffer
-                )
+            def vi_log_focused() -> bool:
+                return get_app().current_buffer is log_buffer
 
             @Condition
-            def vi_command_focused():
-                app = get_app()
-                return _Conditions.vi_buffer_focused() and app.layout.has_focus(
-                    self._editor.command_buffer
-                )
+            def vi_command_focused() -> bool:
+                return get_app().current_buffer is command_buffer
 
             @Condition
-            def tree_menu_toggled():
+            def tree_menu_toggled() -> bool:
                 return self._is_tree_menu_toggled
 
             @Condition
-            def terminal_toggled():
+            def terminal_toggled() -> bool:
                 return self._is_terminal_toggled
 
         self.vi_buffer_focused = _Conditions.vi_buffer_focused
@@ -53,10 +44,10 @@ class Filters:
         self.tree_menu_toggled = _Conditions.tree_menu_toggled
         self.terminal_toggled = _Conditions.terminal_toggled
 
-    def tree_menu_toggle(self):
+    def tree_menu_toggle(self) -> bool:
         self._is_tree_menu_toggled = not self._is_tree_menu_toggled
         return self._is_tree_menu_toggled
 
-    def terminal_toggle(self):
+    def terminal_toggle(self) -> bool:
         self._is_terminal_toggled = not self._is_terminal_toggled
         return self._is_terminal_toggled
@@ -1,8 +1,13 @@
 from sno_py.icons import icons
 
+_LANGUAGE_ICONS = {
+    tag[len("seti-") :]: icon for tag, icon in icons.items() if tag.startswith("seti-")
+}
+_DEFAULT_LANGUAGE_ICON = icons.get("seti-text")
+
 
 def get_language_icon(language_id: str) -> str:
-    return icons.get(f"seti-{language_id}", icons.get("seti-text"))
+    return _LANGUAGE_ICONS.get(language_id, _DEFAULT_LANGUAGE_ICON)
 
 
 def get_icon(tag: str) -> str:
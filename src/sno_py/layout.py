@@ -1,11 +1,15 @@
 import asyncio
 import os
 import sys
+import time
+from functools import lru_cache
 import ptvertmenu
 from prompt_toolkit.application import get_app
+from prompt_toolkit.eventloop import run_in_executor_with_context
 from prompt_toolkit.filters import Condition, has_focus, is_searching
 from prompt_toolkit.layout import (
     ConditionalContainer,
+    DynamicContainer,
     Float,
     FloatContainer,
     HSplit,
@@ -30,7 +34,6 @@ from prompt_toolkit.layout.processors import (
     Transformation,
     TransformationInput,
 )
-from prompt_toolkit.layout.utils import explode_text_fragments
 from prompt_toolkit.widgets.toolbars import FormattedTextToolbar, SearchToolbar
 from prompt_toolkit.keys import Keys
 from prompt_toolkit.mouse_events import MouseEventType
@@ -38,6 +41,9 @@ from ptterm import Terminal
 
 from sno_py.vi_modes import get_input_mode
 from sno_py.fonts_utils import get_icon
+from sno_py.strings import get_string
+
+_LISTING_TTL = 5.0
 
 
 class VSep(Window):
@@ -55,10 +61,11 @@ class HSep(Window):
 
 
 class TreeItem:
-    def __init__(self, name, path, is_dir, is_root=False):
+    def __init__(self, name, path, is_dir, is_root=False, level=0):
         self.name = name
         self.path = path
         self.is_dir = is_dir
+        self.level = level
         self.children = []
         self.expanded = is_root
         self.is_root = is_root
@@ -71,32 +78,58 @@ class TreeDirectoryMenu(ConditionalContainer):
         self.root = None
         self.menu_items = []
         self.menu = None
+        self._path_index = {}
+        self._listing_cache = {}
 
         super().__init__(VSplit([]), filter=editor.filters.tree_menu_toggled)
 
     def initialize(self):
         if self.root is None:
             self.root = self.build_tree(".", is_root=True)
-            self.menu_items = self.get_menu_items()
+            self.menu_items = [(f"  {get_string('loading')}", self.root.path)]
             self.menu = ptvertmenu.VertMenu(
                 items=self.menu_items, accept_handler=self.accept_handler
             )
             self.content = VSplit([self.menu, VSep()])
+            asyncio.create_task(self._load_root())
+
+    async def _load_root(self):
+        # Listing the root can stall on slow mounts, so scan it off the loop.
+        entries = await run_in_executor_with_context(_scan_directory, self.root.path)
+        self._attach_children(self.root, entries)
+        self.menu_items = self.get_menu_items()
+        self.menu.items = self.menu_items
+        get_app().invalidate()
 
     def build_tree(self, path, is_root=False):
         root = TreeItem(os.path.basename(path), path, True, is_root)
-        if is_root:
-            self.load_directory(root)
+        self._path_index[root.path] = root
         return root
 
     def load_directory(self, node):
         if not node.loaded:
-            for item in sorted(os.listdir(node.path)):
-                full_path = os.path.join(node.path, item)
-                if os.path.isdir(full_path):
-                    node.children.append(TreeItem(item, full_path, True))
-                else:
-                    node.children.append(TreeItem(item, full_path, False))
+            self._attach_children(node, self._list_directory(node.path))
+
+    def _list_directory(self, path):
+        # Rapid expand/collapse cycles reuse the last listing for a short while.
+        # Only directories still in the tree keep an entry; collapsing a parent
+        # drops the listings of everything below it.
+        now = time.monotonic()
+        cached = self._listing_cache.get(path)
+        if cached is not None and now - cached[0] < _LISTING_TTL:
+            return cached[1]
+        entries = _scan_directory(path)
+        self._listing_cache[path] = (now, entries)
+        return entries
+
+    def _attach_children(self, node, entries):
+        if not node.loaded:
+            level = 0 if node.is_root else node.level + 1
+            node.children.extend(
+                TreeItem(name, path, is_dir, level=level)
+                for name, path, is_dir in entries
+            )
+            self._path_index.update((child.path, child) for child in node.children)
             node.loaded = True
 
     def get_menu_items(self, node=None, level=0):
@@ -132,40 +165,48 @@ class TreeDirectoryMenu(ConditionalContainer):
 
     def accept_handler(self, item):
         path = item[1]
-        if os.path.isdir(path):
+        node = self._path_index.get(path)
+        if node is not None and node.is_dir:
             self.toggle_directory(path)
         else:
             asyncio.create_task(self.editor.create_file_buffer(path))
             self.editor.close_tree_menu()
 
     def toggle_directory(self, dir_path):
-        node = self.find_node(self.root, dir_path)
+        node = self._path_index.get(dir_path)
         if node and not node.is_root:
+            toggled_index = next(
+                (i for i, item in enumerate(self.menu_items) if item[1] == dir_path),
+                None,
+            )
+            if toggled_index is not None:
+                # Only the toggled subtree changes, so only its rows are rebuilt.
+                rows = len(self.get_menu_items(node, node.level))
+
             node.expanded = not node.expanded
             if node.expanded and not node.loaded:
                 self.load_directory(node)
             elif not node.expanded:
+                self._forget_children(node)
                 node.children = []
                 node.loaded = False
-            self.menu_items = self.get_menu_items()
+
+            if toggled_index is None:
+                self.menu_items = self.get_menu_items()
+            else:
+                self.menu_items[toggled_index : toggled_index + rows] = (
+                    self.get_menu_items(node, node.level)
+                )
             self.menu.items = self.menu_items
 
-            toggled_index = next(
-                (i for i, item in enumerate(self.menu_items) if item[1] == dir_path),
-                None,
-            )
             if toggled_index is not None:
                 self.menu.selected_item = self.menu_items[toggled_index]
 
-    def find_node(self, node, path):
-        if node.path == path:
-            return node
-        if node.is_dir:
-            for child in node.children:
-                found = self.find_node(child, path)
-                if found:
-                    return found
-        return None
+    def _forget_children(self, node):
+        for child in node.children:
+            self._forget_children(child)
+            del self._path_index[child.path]
+            self._listing_cache.pop(child.path, None)
 
 
 class TerminalSplit(ConditionalContainer):
@@ -303,13 +344,19 @@ class LogToolBar(ConditionalContainer):
 
 class LspReporterToolBar(ConditionalContainer):
     def __init__(self, editor) -> None:
+        # The filter and the toolbar text both ask for the message on every
+        # render; remember it until the cursor row or the reports change.
+        self._cache = (None, [])
+
         def get_message_at_cursor():
-            if (active_buffer := editor.active_buffer) is not None:
-                line = active_buffer.buffer_inst.document.cursor_position_row
-                for report in active_buffer.reports():
-                    if report.range.start.line == line:
-                        return report.message
-            return []
+            if (active_buffer := editor.active_buffer) is None:
+                return []
+            line = active_buffer.buffer_inst.document.cursor_position_row
+            key = (active_buffer, line, active_buffer.reports_version)
+            if key != self._cache[0]:
+                reports = active_buffer.reports_at(line)
+                self._cache = (key, reports[0].message if reports else [])
+            return self._cache[1]
 
         super(LspReporterToolBar, self).__init__(
             FormattedTextToolbar(get_message_at_cursor, style="class:lsp-message-text"),
@@ -329,27 +376,52 @@ class LspReporterProcessor(Processor):
     ) -> Transformation:
         fragments = transformation_input.fragments
         if (active_buffer := self._editor.active_buffer) is not None:
-            for report in active_buffer.reports():
-                if report.range.start.line == transformation_input.lineno:
-                    fragments = explode_text_fragments(fragments)
-                    for i in range(
-                        report.range.start.character, report.range.end.character
-                    ):
-                        if i < len(fragments):
-                            fragments[i] = (" class:pygments.error", fragments[i][1])
+            for report in active_buffer.reports_at(transformation_input.lineno):
+                fragments = _restyle_range(
+                    fragments,
+                    report.range.start.character,
+                    report.range.end.character,
+                    " class:pygments.error",
+                )
         return Transformation(fragments)
 
 
+def _restyle_range(fragments, start, end, style):
+    if end <= start:
+        return fragments
+    result = []
+    position = 0
+    for fragment in fragments:
+        text = fragment[1]
+        fragment_end = position + len(text)
+        if fragment_end <= start or position >= end:
+            result.append(fragment)
+        else:
+            head = start - position
+            tail = end - position
+            if head > 0:
+                result.append((fragment[0], text[:head], *fragment[2:]))
+            result.append((style, text[max(head, 0) : tail]))
+            if tail < len(text):
+                result.append((fragment[0], text[tail:], *fragment[2:]))
+        position = fragment_end
+    return result
+
+
 class SnoLayout:
     def __init__(self, editor):
         self.editor = editor
         self.search_toolbar = None
         self.search_control = None
         self.status_bar = None
+        self._processors = None
         self.directory_tree = TreeDirectoryMenu(editor)
         self.terminal = TerminalSplit(editor)
         self.custom_hsplits = []
         self.custom_vsplits = []
+        self._layout = None
+        self._layout_key = None
+        self._windows = {}
 
     def _initialize_components(self):
         if not self.search_toolbar:
@@ -362,32 +434,35 @@ class SnoLayout:
             self.status_bar = VSplit(
                 [StatusBar(self.editor), StatusBarRuller(self.editor)]
             )
-
-    def _create_buffer_control(self):
-        return BufferControl(
-            buffer=self.editor.active_buffer.buffer_inst,
-            search_buffer_control=self.search_control,
-            focus_on_click=True,
-            preview_search=True,
-            lexer=self.editor.active_buffer.lexer,
-            include_default_input_processors=False,
-            input_processors=[
+        if not self._processors:
+            tab_char2 = _try_char("\u2508", ".", get_app().output.encoding())
+            self._processors = [
                 LspReporterProcessor(self.editor),
                 ShowTrailingWhiteSpaceProcessor(),
                 HighlightSelectionProcessor(),
                 HighlightSearchProcessor(),
                 HighlightMatchingBracketProcessor(),
                 TabsProcessor(
-                    tabstop=self.editor.tabstop,
+                    tabstop=lambda: self.editor.tabstop,
                     char1=lambda: "|"
                     if self.editor.display_unprintable_characters
                     else " ",
-                    char2=lambda: _try_char("\u2508", ".", get_app().output.encoding())
+                    char2=lambda: tab_char2
                     if self.editor.display_unprintable_characters
                     else " ",
                 ),
                 DisplayMultipleCursors(),
-            ],
+            ]
+
+    def _create_buffer_control(self):
+        return BufferControl(
+            buffer=self.editor.active_buffer.buffer_inst,
+            search_buffer_control=self.search_control,
+            focus_on_click=True,
+            preview_search=True,
+            lexer=self.editor.active_buffer.lexer,
+            include_default_input_processors=False,
+            input_processors=self._processors,
         )
 
     def _create_main_window(self):
@@ -404,13 +479,33 @@ class SnoLayout:
             ],
         )
 
+    def _get_main_window(self):
+        # One window per buffer, so switching buffers keeps each control's
+        # render caches instead of rebuilding the whole layout.
+        buffer = self.editor.active_buffer
+        window = self._windows.get(buffer)
+        if window is None:
+            alive = set(self.editor.buffers)
+            self._windows = {b: w for b, w in self._windows.items() if b in alive}
+            window = self._windows[buffer] = self._create_main_window()
+        return window
+
     @property
     def layout(self):
         if not get_app().is_running:
             return Layout(Window())
+        key = (tuple(self.custom_hsplits), tuple(self.custom_vsplits))
+        if self._layout is None or key != self._layout_key:
+            self._layout = self._build_layout()
+            self._layout_key = key
+        return self._layout
+
+    def _build_layout(self):
         self._initialize_components()
 
-        main_vsplit = VSplit([self.directory_tree, self._create_main_window()])
+        main_vsplit = VSplit(
+            [self.directory_tree, DynamicContainer(self._get_main_window)]
+        )
         main_vsplit.children = main_vsplit.children + self.custom_vsplits
 
         main_hsplit = HSplit(
@@ -450,6 +545,18 @@ class SnoLayout:
         return layout
 
 
+def _scan_directory(path):
+    try:
+        with os.scandir(path) as it:
+            entries = [(entry.name, entry.path, entry.is_dir()) for entry in it]
+    except (PermissionError, NotADirectoryError, FileNotFoundError):
+        return []
+    # Directories first, then case-insensitive by name.
+    entries.sort(key=lambda entry: (not entry[2], entry[0].lower()))
+    return entries
+
+
+@lru_cache(maxsize=8)
 def _try_char(character: str, backup, encoding=sys.stdout.encoding):
     """
     Return `character` if it can be encoded using sys.stdout, else return the
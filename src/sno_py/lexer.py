@@ -1,5 +1,6 @@
 import importlib
-from typing import Callable, Dict
+from functools import cache
+from typing import Callable
 
 from prompt_toolkit.lexers import SimpleLexer, PygmentsLexer, Lexer
 from prompt_toolkit.document import Document
@@ -8,8 +9,6 @@ from prompt_toolkit.formatted_text.base import StyleAndTextTuples
 from pygments.lexers import get_lexer_by_name
 from pygments.util import ClassNotFound
 
-_CACHE: Dict[str, Lexer] = {}
-
 
 class FileLexer(Lexer):
     def __init__(self, editor, path: str) -> None:
@@ -18,21 +17,21 @@ class FileLexer(Lexer):
 
     def lex_document(self, document: Document) -> Callable[[int], StyleAndTextTuples]:
         filetype = self._editor.filetype.guess_filetype(self._path, document.text)
-        if filetype not in _CACHE.keys():
-            known = _KNOWN_LEXERS.get(filetype, None)
-            if known is not None:
-                module, cls = known
-                module = importlib.import_module(module)
-                cls = getattr(module, cls)
-                _CACHE[filetype] = PygmentsLexer(cls, sync_from_start=False)
-            else:
-                try:
-                    _CACHE[filetype] = PygmentsLexer(
-                        get_lexer_by_name(filetype).__class__
-                    )
-                except ClassNotFound as _:
-                    _CACHE[filetype] = SimpleLexer()
-        return _CACHE[filetype].lex_document(document)
+        return _get_lexer(filetype).lex_document(document)
+
+
+@cache
+def _get_lexer(filetype: str) -> Lexer:
+    known = _KNOWN_LEXERS.get(filetype, None)
+    if known is not None:
+        module, cls = known
+        module = importlib.import_module(module)
+        cls = getattr(module, cls)
+        return PygmentsLexer(cls, sync_from_start=False)
+    try:
+        return PygmentsLexer(get_lexer_by_name(filetype).__class__)
+    except ClassNotFound as _:
+        return SimpleLexer()
 
 
 _KNOWN_LEXERS = {
@@ -3,6 +3,7 @@ import contextlib
 import pathlib
 import subprocess
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import AsyncGenerator, Coroutine, List, Optional, Type
 
 import sansio_lsp_client as lsp
@@ -11,9 +12,17 @@ from sansio_lsp_client.io_handler import _make_request, _make_response
 from sansio_lsp_client.structs import JSONDict, Request
 
 
+_PREFIX_STEP = 4096
+
+
 class LanguageServerCrashed(Exception): ...
 
 
+@lru_cache(maxsize=256)
+def path_to_uri(file_path: str) -> str:
+    return pathlib.Path(file_path).as_uri()
+
+
 @dataclass
 class NotificationHandler:
     of_type: BaseModel
@@ -92,6 +101,7 @@ class LspClient:
         self._notification_handlers = []
 
         self._signature_triggers = []
+        self._text_document_sync = None
 
     async def _send_stdin(self):
         try:
@@ -160,6 +170,7 @@ class LspClient:
         self._signature_triggers = initialized.capabilities.get(
             "signatureHelpProvider", {}
         ).get("triggerCharacters", [])
+        self._text_document_sync = initialized.capabilities.get("textDocumentSync")
 
     def _try_default_reply(self, msg):
         if isinstance(
@@ -260,7 +271,7 @@ class LspClient:
         self, language_id: str, file_path: str, file_contents: str
     ) -> lsp.TextDocumentItem:
         document = lsp.TextDocumentItem(
-            uri=pathlib.Path(file_path).as_uri(),
+            uri=path_to_uri(file_path),
             languageId=language_id,
             text=file_contents,
             version=1,
@@ -273,7 +284,7 @@ class LspClient:
     def close_document(self, file_path: str):
         self.lsp_client.did_close(
             lsp.TextDocumentIdentifier(
-                uri=pathlib.Path(file_path).as_uri(),
+                uri=path_to_uri(file_path),
             )
         )
 
@@ -283,12 +294,16 @@ class LspClient:
         version: int,
         text: str,
         want_diagnostics: Optional[bool] = None,
+        previous_text: Optional[str] = None,
     ):
         text_document = lsp.VersionedTextDocumentIdentifier(
-            uri=pathlib.Path(file_path).as_uri(),
+            uri=path_to_uri(file_path),
             version=version,
         )
-        content_changes = [lsp.TextDocumentContentChangeEvent(text=text)]
+        if previous_text is not None and self.incremental_sync:
+            content_changes = [_make_range_change(previous_text, text)]
+        else:
+            content_changes = [lsp.TextDocumentContentChangeEvent(text=text)]
 
         # NOTE - The following is copied from sansio-lsp-client to add the wantDiagnostics property
         assert self.lsp_client._state == lsp.ClientState.NORMAL
@@ -309,7 +324,7 @@ class LspClient:
     def save_document(self, document_path: str):
         self.lsp_client.did_save(
             lsp.TextDocumentIdentifier(
-                uri=pathlib.Path(document_path).as_uri(),
+                uri=path_to_uri(document_path),
             )
         )
 
@@ -318,9 +333,7 @@ class LspClient:
     ) -> AsyncGenerator[lsp.CompletionItem, None]:
         self.lsp_client.completion(
             text_document_position=lsp.TextDocumentPosition(
-                textDocument=lsp.TextDocumentIdentifier(
-                    uri=pathlib.Path(file_path).as_uri()
-                ),
+                textDocument=lsp.TextDocumentIdentifier(uri=path_to_uri(file_path)),
                 position=lsp.Position(line=line, character=character),
             ),
             context=lsp.CompletionContext(
@@ -339,9 +352,7 @@ class LspClient:
     async def request_signature(self, file_path: str, line: int, character: int):
         self.lsp_client.signatureHelp(
             text_document_position=lsp.TextDocumentPosition(
-                textDocument=lsp.TextDocumentIdentifier(
-                    uri=pathlib.Path(file_path).as_uri()
-                ),
+                textDocument=lsp.TextDocumentIdentifier(uri=path_to_uri(file_path)),
                 position=lsp.Position(line=line, character=character),
             ),
         )
@@ -353,6 +364,13 @@ class LspClient:
     def signature_triggers(self):
         return self._signature_triggers
 
+    @property
+    def incremental_sync(self) -> bool:
+        sync = self._text_document_sync
+        if isinstance(sync, dict):
+            sync = sync.get("change")
+        return sync == lsp.TextDocumentSyncKind.INCREMENTAL
+
     async def exit(self):
         if self._process:
             try:
@@ -386,3 +404,48 @@ class LspClient:
         except asyncio.CancelledError:
             pass
         self._concurrent_tasks = None
+
+
+def _common_prefix_length(a: str, b: str, limit: int) -> int:
+    i = 0
+    while i < limit:
+        j = min(i + _PREFIX_STEP, limit)
+        if a[i:j] != b[i:j]:
+            break
+        i = j
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _common_suffix_length(a: str, b: str, limit: int) -> int:
+    i = 0
+    len_a, len_b = len(a), len(b)
+    while i < limit:
+        j = min(i + _PREFIX_STEP, limit)
+        if a[len_a - j : len_a - i] != b[len_b - j : len_b - i]:
+            break
+        i = j
+    while i < limit and a[len_a - i - 1] == b[len_b - i - 1]:
+        i += 1
+    return i
+
+
+def _offset_to_position(text: str, offset: int) -> lsp.Position:
+    line_start = text.rfind("\n", 0, offset) + 1
+    # LSP columns are counted in UTF-16 code units.
+    character = len(text[line_start:offset].encode("utf-16-le")) // 2
+    return lsp.Position(line=text.count("\n", 0, offset), character=character)
+
+
+def _make_range_change(old: str, new: str) -> lsp.TextDocumentContentChangeEvent:
+    shortest = min(len(old), len(new))
+    prefix = _common_prefix_length(old, new, shortest)
+    suffix = _common_suffix_length(old, new, shortest - prefix)
+    return lsp.TextDocumentContentChangeEvent(
+        range=lsp.Range(
+            start=_offset_to_position(old, prefix),
+            end=_offset_to_position(old, len(old) - suffix),
+        ),
+        text=new[prefix : len(new) - suffix],
+    )
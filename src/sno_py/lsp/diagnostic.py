@@ -4,10 +4,20 @@ from sansio_lsp_client import Diagnostic
 class Diagnostic:
     def __init__(self):
         self._diagnostics = []
+        self._by_line = None
         self._ready = False
+        self.version = 0
 
-    def append(self, diagnostic: Diagnostic):
+    def append(self, diagnostic: Diagnostic) -> None:
         self._diagnostics.append(diagnostic)
+        self._by_line = None
+        self.version += 1
+
+    def replace_all(self, diagnostics: list) -> None:
+        self._diagnostics[:] = diagnostics
+        self._by_line = None
+        self._ready = True
+        self.version += 1
 
     def get_diagnostics(self) -> list:
         if not self._ready:
@@ -15,9 +25,22 @@ class Diagnostic:
         diagnostics = self._diagnostics
         return diagnostics
 
+    def get_line_diagnostics(self, line: int) -> list:
+        if not self._ready:
+            return []
+        if self._by_line is None:
+            by_line = {}
+            for diagnostic in self._diagnostics:
+                by_line.setdefault(diagnostic.range.start.line, []).append(diagnostic)
+            self._by_line = by_line
+        return self._by_line.get(line, [])
+
     def __enter__(self):
         self._ready = False
         self._diagnostics.clear()
+        self._by_line = None
+        self.version += 1
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._ready = True
+        self.version += 1
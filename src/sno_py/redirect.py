@@ -1,6 +1,6 @@
 import asyncio
 import sys
-from functools import wraps
+from functools import cache, wraps
 from typing import Any, Callable, TypeVar, Awaitable, Union
 
 from prompt_toolkit.application import in_terminal
@@ -10,13 +10,18 @@ from prompt_toolkit.eventloop import run_in_executor_with_context
 F = TypeVar("F", bound=Callable[..., Any])
 
 
+@cache
+def _get_editor():
+    from sno_py.snoedit import SnoEdit
+
+    return SnoEdit()
+
+
 def create_redirector(attr_name: str, stream_name: str):
     def decorator(func: F) -> F:
         @wraps(func)
         async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
-            from sno_py.snoedit import SnoEdit
-
-            app = SnoEdit()
+            app = _get_editor()
             original_stream = getattr(sys, stream_name)
             setattr(sys, stream_name, getattr(app, attr_name))
             try:
@@ -27,9 +32,7 @@ def create_redirector(attr_name: str, stream_name: str):
 
         @wraps(func)
         def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
-            from sno_py.snoedit import SnoEdit
-
-            app = SnoEdit()
+            app = _get_editor()
             original_stream = getattr(sys, stream_name)
             setattr(sys, stream_name, getattr(app, attr_name))
             try:
@@ -50,10 +53,12 @@ def terminal(wait_for_enter: bool = False):
     def decorator(
         func: Callable[..., Union[T, Awaitable[T]]],
     ) -> Callable[..., Awaitable[T]]:
+        is_coroutine = asyncio.iscoroutinefunction(func)
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
             async with in_terminal():
-                if asyncio.iscoroutinefunction(func):
+                if is_coroutine:
                     result = await func(*args, **kwargs)
                 else:
                     result = await run_in_executor_with_context(
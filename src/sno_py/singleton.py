@@ -7,8 +7,10 @@ def singleton(cls: T) -> Callable[..., T]:
     instances: Dict[Any, Any] = {}
 
     def get_instance(*args: Any, **kwargs: Any) -> T:
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
+        try:
+            return instances[cls]
+        except KeyError:
+            instance = instances[cls] = cls(*args, **kwargs)
+            return instance
 
     return get_instance
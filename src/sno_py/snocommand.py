@@ -1,5 +1,6 @@
 import ast
 import inspect
+from functools import cache, lru_cache
 
 from prompt_toolkit.completion import PathCompleter, WordCompleter
 from prompt_toolkit.contrib.regular_languages.compiler import compile
@@ -7,6 +8,10 @@ from prompt_toolkit.contrib.regular_languages.completion import GrammarCompleter
 
 from sno_py import redirect
 
+_O_COMPLETER = GrammarCompleter(
+    compile(r"o\s+(?P<path>\S+)"), {"path": PathCompleter(expanduser=True)}
+)
+
 
 @redirect.debug_stderr
 @redirect.debug_stdout
@@ -40,16 +45,13 @@ async def wa(editor, *args, **kwargs) -> None:
 @redirect.debug_stdout
 async def o(editor, *args, **kwargs) -> None:
     del kwargs["_raw"]
-    for arg in args:
-        await editor.create_file_buffer(arg, **kwargs)
+    await editor.create_file_buffers(args, **kwargs)
 
 
 @redirect.debug_stderr
 @redirect.debug_stdout
 def o_completion_handler(editor, args: list):
-    return GrammarCompleter(
-        compile("o\s+(?P<path>\S+)"), {"path": PathCompleter(expanduser=True)}
-    )
+    return _O_COMPLETER
 
 
 @redirect.debug_stderr
@@ -62,10 +64,19 @@ async def buffer(editor, *args, **kwargs) -> None:
 @redirect.debug_stderr
 @redirect.debug_stdout
 def buffer_completion_handler(editor, args: list):
+    return _get_buffer_completer(editor)
+
+
+def _buffer_names(editor) -> list:
     buffers = [b.display_name_with_index for b in editor.buffers]
     if editor.debug_buffer.display_name_with_index not in buffers:
         buffers.append(editor.debug_buffer.display_name)
-    return WordCompleter(buffers)
+    return buffers
+
+
+@cache
+def _get_buffer_completer(editor):
+    return WordCompleter(lambda: _buffer_names(editor))
 
 
 @redirect.terminal(wait_for_enter=True)
@@ -78,11 +89,45 @@ async def execx_no_wait(editor, *args, **kwargs) -> None:
     await editor.aexecx(kwargs["_raw"])
 
 
+_DEFAULT_COMMANDS = (
+    (q, "q", None),
+    (qa, "qa", None),
+    (w, "w", None),
+    (wa, "wa", None),
+    ([w, q], "wq", None),
+    ([wa, qa], "wqa", None),
+    (o, "o", o_completion_handler),
+    (buffer, "buffer", buffer_completion_handler),
+    (execx, "!", None),
+    (execx_no_wait, "!!", None),
+)
+
+_BANG_COMMANDS = frozenset(("!", "!!"))
+# Long inputs are usually one-off :! snippets, not worth a cache slot.
+_SPLIT_CACHE_LIMIT = 128
+
+
+def _split_command(command: str):
+    split = command.split(None, 1)
+    if not split:
+        return None
+    name = split[0]
+    rest = split[1] if len(split) > 1 else ""
+    force = name.endswith("!") and name not in _BANG_COMMANDS
+    if force:
+        name = name[:-1]
+    return name, rest, force
+
+
+_split_short_command = lru_cache(maxsize=256)(_split_command)
+
+
 class SnoCommand:
     def __init__(self, editor) -> None:
         self._editor = editor
         self._handlers = {}
         self._completion_handlers = {}
+        self._default_completer = WordCompleter(words=self._handlers.keys())
 
         self.completer = self.default_completer
 
@@ -95,18 +140,22 @@ class SnoCommand:
         commands = self._parse_command(command_input)
 
         for cmd in commands:
-            split = cmd.split(None, 1)
+            if len(cmd) < _SPLIT_CACHE_LIMIT:
+                split = _split_short_command(cmd)
+            else:
+                split = _split_command(cmd)
+            if split is None:
+                continue
+            cmd, rest, force = split
             args = []
             kwargs = {}
-            if len(split) > 1:
-                cmd, rest = split
+            if rest:
                 args, kwargs = self._parse_args_kwargs(rest)
-            if cmd.endswith("!") and cmd not in ["!", "!!"]:
+            if force:
                 kwargs["force"] = True
-                cmd = cmd[:-1]
-            if cmd in self._handlers:
-                kwargs["_raw"] = split[-1] if len(args) > 0 else ""
-                func = self._handlers[cmd]
+            func = self._handlers.get(cmd)
+            if func is not None:
+                kwargs["_raw"] = rest if len(args) > 0 else ""
                 if isinstance(func, list):
                     for f in func:
                         result = f(self._editor, *args, **kwargs)
@@ -126,18 +175,7 @@ class SnoCommand:
             raise ValueError("Invalid command input type")
 
     def _create_defaults(self) -> None:
-        self.add_command_handler(q, "q")
-        self.add_command_handler(qa, "qa")
-        self.add_command_handler(w, "w")
-        self.add_command_handler(wa, "wa")
-        self.add_command_handler([w, q], "wq")
-        self.add_command_handler([wa, qa], "wqa")
-        self.add_command_handler(o, "o", completion_handler=o_completion_handler)
-        self.add_command_handler(
-            buffer, "buffer", completion_handler=buffer_completion_handler
-        )
-        self.add_command_handler(execx, "!")
-        self.add_command_handler(execx_no_wait, "!!")
+        self.add_command_handlers(_DEFAULT_COMMANDS)
 
     def add_command_handler(self, func, name: str, completion_handler=None) -> None:
         if isinstance(name, list):
@@ -150,10 +188,22 @@ class SnoCommand:
             if completion_handler:
                 self._completion_handlers[name] = completion_handler
 
+    def add_command_handlers(self, table) -> None:
+        table = tuple(table)
+        self._handlers.update((name, func) for func, name, _ in table)
+        self._completion_handlers.update(
+            (name, completion_handler)
+            for _, name, completion_handler in table
+            if completion_handler
+        )
+
     def _parse_args_kwargs(self, input_str):
+        parts = input_str.split()
+        if "=" not in input_str:
+            return parts, {}
+
         args = []
         kwargs = {}
-        parts = input_str.split()
 
         for part in parts:
             if "=" in part:
@@ -198,4 +248,4 @@ class SnoCommand:
 
     @property
     def default_completer(self):
-        return WordCompleter(words=self._handlers.keys())
+        return self._default_completer
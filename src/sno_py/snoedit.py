@@ -1,6 +1,8 @@
+import asyncio
 import os
 import re
 import shlex
+from bisect import bisect_left
 from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 from functools import partial
@@ -11,7 +13,6 @@ from prompt_toolkit.application import Application, get_app
 from prompt_toolkit.cursor_shapes import ModalCursorShapeConfig
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.clipboard.in_memory import InMemoryClipboard
-from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
 from prompt_toolkit.completion import Completer
 from prompt_toolkit.enums import EditingMode
 from prompt_toolkit.filters import has_focus
@@ -35,6 +36,15 @@ from sno_py.strings import get_string
 from ptterm.utils import get_default_shell
 from prompt_toolkit.output.color_depth import ColorDepth
 
+_COLOR_DEPTH_BOUNDS = (0, 1, 4, 8)
+_COLOR_DEPTHS = (
+    ColorDepth.MONOCHROME,
+    ColorDepth.DEPTH_1_BIT,
+    ColorDepth.DEPTH_4_BIT,
+    ColorDepth.DEPTH_8_BIT,
+    ColorDepth.DEPTH_24_BIT,
+)
+
 
 @singleton
 class SnoEdit(object):
@@ -43,11 +53,11 @@ class SnoEdit(object):
         self.config_dir = user_config_dir("sno.py")
         self.cache_dir = user_cache_dir("snoo.py")
         self.home_dir = Path.home()
+        self.cwd = os.getcwd()
 
         self._create_base_dirs()
 
         self.filetype = FileType()
-        self.filters = Filters(self)
         self.lsp = LanguageClientManager(self)
 
         self.command_runner = SnoCommand(self)
@@ -65,6 +75,8 @@ class SnoEdit(object):
         self.log_handler = LogBuffer(self)
         self.log_buffer = self.log_handler.buffer_inst
 
+        self.filters = Filters(self)
+
         self.buffer_completer: Completer = None
 
         self.buffers = []
@@ -81,6 +93,7 @@ class SnoEdit(object):
         self._show_relative_numbers = True
         self._expand_tab = True
         self._tabstop = 4
+        self._tab_text = " " * self._tabstop
         self._display_unprintable_characters = True
         self._use_system_clipboard = True
         self._use_nerd_fonts = False
@@ -93,12 +106,14 @@ class SnoEdit(object):
         self.app: Application = None
 
     async def enter_command_mode(self) -> None:
-        self.app.layout.focus(self.command_buffer)
-        self.app.vi_state.input_mode = InputMode.INSERT
+        app = self.app
+        app.layout.focus(self.command_buffer)
+        app.vi_state.input_mode = InputMode.INSERT
 
     def leave_command_mode(self) -> None:
-        self.app.layout.focus_last()
-        self.app.vi_state.input_mode = InputMode.NAVIGATION
+        app = self.app
+        app.layout.focus_last()
+        app.vi_state.input_mode = InputMode.NAVIGATION
         self.command_buffer.reset()
 
     async def process_command(self) -> None:
@@ -162,12 +177,15 @@ class SnoEdit(object):
     def pygments_class(self, val) -> None:
         self._pygments_class = val
         _style = style_from_pygments_cls(self.pygments_class)
+        container_color = adjust_color_brightness(
+            self.pygments_class.background_color, 1.2
+        )
 
         self._style_extra = Style.from_dict(
             {
                 "background": f"bg:{self.pygments_class.background_color}",
-                "container": f"bg:{adjust_color_brightness(self.pygments_class.background_color, 1.2)}",
-                "completion-menu": f"bg:{adjust_color_brightness(self.pygments_class.background_color, 1.2)} {self.pygments_class.styles[String]}",
+                "container": f"bg:{container_color}",
+                "completion-menu": f"bg:{container_color} {self.pygments_class.styles[String]}",
                 "search": f"bg:{self.pygments_class.styles[String]} {self.pygments_class.highlight_color} underline",
                 "selected": f"bg:{self.pygments_class.styles[String]} {self.pygments_class.highlight_color} underline",
                 "completion-menu.completion.current": f"{self.pygments_class.highlight_color} underline",
@@ -215,6 +233,7 @@ class SnoEdit(object):
     @expand_tab.setter
     def expand_tab(self, value):
         self._expand_tab = bool(value)
+        self._update_tab_text()
         self.refresh_layout()
 
     @property
@@ -224,8 +243,16 @@ class SnoEdit(object):
     @tabstop.setter
     def tabstop(self, value):
         self._tabstop = value
+        self._update_tab_text()
         self.refresh_layout()
 
+    @property
+    def tab_text(self) -> str:
+        return self._tab_text
+
+    def _update_tab_text(self) -> None:
+        self._tab_text = " " * self._tabstop if self._expand_tab else "\t"
+
     @property
     def display_unprintable_characters(self):
         return self._display_unprintable_characters
@@ -256,9 +283,11 @@ class SnoEdit(object):
 
     @property
     def clipboard(self):
-        return (
-            PyperclipClipboard() if self._use_system_clipboard else InMemoryClipboard()
-        )
+        if not self._use_system_clipboard:
+            return InMemoryClipboard()
+        from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
+
+        return PyperclipClipboard()
 
     @property
     def terminal(self):
@@ -281,16 +310,7 @@ class SnoEdit(object):
     def _get_color_depth(self):
         if self._color_depth is None:
             return None
-        if self._color_depth <= 0:
-            return ColorDepth.MONOCHROME
-        elif self._color_depth <= 1:
-            return ColorDepth.DEPTH_1_BIT
-        elif self._color_depth <= 4:
-            return ColorDepth.DEPTH_4_BIT
-        elif self._color_depth <= 8:
-            return ColorDepth.DEPTH_8_BIT
-        else:
-            return ColorDepth.DEPTH_24_BIT
+        return _COLOR_DEPTHS[bisect_left(_COLOR_DEPTH_BOUNDS, self._color_depth)]
 
     def log(self, text: str) -> None:
         self.log_handler.write(text)
@@ -301,12 +321,14 @@ class SnoEdit(object):
         self.unfocus_log_buffer()
 
     def focus_log_buffer(self) -> None:
-        self.app.layout.focus(self.log_buffer)
-        self.app.vi_state.input_mode = InputMode.NAVIGATION
+        app = self.app
+        app.layout.focus(self.log_buffer)
+        app.vi_state.input_mode = InputMode.NAVIGATION
 
     def unfocus_log_buffer(self) -> None:
-        self.app.layout.focus_last()
-        self.app.vi_state.input_mode = InputMode.NAVIGATION
+        app = self.app
+        app.layout.focus_last()
+        app.vi_state.input_mode = InputMode.NAVIGATION
 
     def reset_buffers(self) -> None:
         if has_focus(self.command_buffer):
@@ -328,20 +350,40 @@ class SnoEdit(object):
             self.log(get_string("read_only"))
 
     async def create_file_buffer(self, path: str, encoding: str = "utf-8") -> None:
-        try:
+        await self.create_file_buffers([path], encoding)
+
+    async def create_file_buffers(self, paths: list, encoding: str = "utf-8") -> None:
+        buffers = []
+        for path in paths:
             if not path:
-                return
-            for buffer in self.buffers:
-                if buffer.path == os.path.abspath(path):
-                    if not buffer.path == self.active_buffer.path:
-                        self.select_buffer(buffer.index)
-                        return
-            buffer = FileBuffer(self, os.path.abspath(path), encoding)
-            await buffer.load()
+                continue
+            path = os.path.normpath(os.path.join(self.cwd, path))
+            opened = next(
+                (
+                    buffer
+                    for buffer in self.buffers
+                    if buffer.path == path and buffer.path != self.active_buffer.path
+                ),
+                None,
+            )
+            if opened is not None:
+                self.select_buffer(opened.index)
+                continue
+            buffers.append(FileBuffer(self, path, encoding))
+
+        results = await asyncio.gather(
+            *(buffer.load() for buffer in buffers), return_exceptions=True
+        )
+        # Failed loads are skipped, but cancellation must still propagate.
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        for buffer, result in zip(buffers, results):
+            if isinstance(result, Exception):
+                if isinstance(result, IsADirectoryError):
+                    self.log(str(result))
+                continue
             self.add_buffer(buffer)
-        except Exception as e:
-            if isinstance(e, IsADirectoryError):
-                self.log(str(e))
 
     def select_buffer(self, index):
         if isinstance(index, str):
@@ -350,7 +392,7 @@ class SnoEdit(object):
                     if b.display_name.endswith("*debug*"):
                         index = b.index
                 if isinstance(index, str):
-                    self.debug_buffer.reindex()
+                    self.debug_buffer.index = len(self.buffers)
                     self.buffers.append(self.debug_buffer)
                     index = self.debug_buffer.index
             else:
@@ -368,10 +410,26 @@ class SnoEdit(object):
             return False
         return True
 
-    async def save_all_buffers(self) -> None:
+    async def save_all_buffers(self) -> bool:
+        # Different files are written concurrently, but buffers sharing a path
+        # are saved one after another, in the same order as the old serial loop.
+        by_path = {}
         for b in reversed(self.buffers):
-            if not await b.save():
-                break
+            by_path.setdefault(b.path, []).append(b)
+
+        async def save_in_order(buffers):
+            saved = True
+            for b in buffers:
+                saved = await b.save() and saved
+            return saved
+
+        results = await asyncio.gather(
+            *(save_in_order(group) for group in by_path.values())
+        )
+        if not all(results):
+            self.log(get_string("read_only"))
+            return False
+        return True
 
     async def close_current_buffer(self, buffer=None, forced: bool = False) -> bool:
         if not buffer:
@@ -418,29 +476,30 @@ class SnoEdit(object):
 
     def refresh_layout(self) -> None:
         if self.app:
-            for buffer in self.buffers:
-                buffer.reindex()
+            for index, buffer in enumerate(self.buffers):
+                buffer.index = index
             self.app.invalidate()
             self.app.layout = self.layout.layout
+            self.app.layout.focus(self.active_buffer.buffer_inst)
 
     async def _load_snorc(self) -> None:
-        from prompt_toolkit.eventloop import run_in_executor_with_context
-        from functools import partial
-
-        if os.path.isfile(self.home_dir / ".snorc"):
-            with open(self.home_dir / ".snorc") as rc:
-                with redirect_stdout(self.debug_buffer):
-                    with redirect_stderr(self.debug_buffer):
-                        await run_in_executor_with_context(
-                            partial(
-                                self._xsh.builtins.execx,
-                                rc.read(),
-                                glbs={"editor": self},
-                            )
+        snorc = self.home_dir / ".snorc"
+        if snorc.is_file():
+            rc = await run_in_executor_with_context(snorc.read_text)
+            with redirect_stdout(self.debug_buffer):
+                with redirect_stderr(self.debug_buffer):
+                    await run_in_executor_with_context(
+                        partial(
+                            self._xsh.builtins.execx,
+                            rc,
+                            glbs={"editor": self},
                         )
+                    )
+            self.cwd = os.getcwd()
 
     def execx(self, code) -> None:
         self._xsh.builtins.execx(code, glbs={"editor": self})
+        self.cwd = os.getcwd()
 
     async def aexecx(self, code) -> None:
         await run_in_executor_with_context(self.execx, code)
@@ -2,6 +2,7 @@ _STRINGS = {
     "not_saved": "No write since last change",
     "read_only": "Buffer is read only",
     "unknown_error": "Unknown error",
+    "loading": "Loading...",
 }
 
 
@@ -13,11 +13,18 @@ class FileBuffer:
     def _is_new(self) -> bool: ...
     @property
     def buffer_inst(self) -> Buffer: ...
+    @property
+    def index(self) -> int: ...
+    @index.setter
+    def index(self, index: int) -> None: ...
     def load(self) -> None: ...
     @property
     def path(self) -> str: ...
     @property
     def read_only(self) -> bool: ...
+    def reports_at(self, line: int) -> list: ...
+    @property
+    def reports_version(self) -> int: ...
     def save(self) -> bool: ...
     @property
     def saved(self) -> bool: ...
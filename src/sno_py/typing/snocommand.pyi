@@ -1,4 +1,4 @@
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.completion.word_completer import WordCompleter
@@ -24,6 +24,12 @@ class SnoCommand:
         name: str,
         completion_handler: Optional[Callable] = ...,
     ) -> None: ...
+    def add_command_handlers(
+        self,
+        table: Iterable[
+            Tuple[Union[List[Callable], Callable], str, Optional[Callable]]
+        ],
+    ) -> None: ...
     @property
     def default_completer(self) -> WordCompleter: ...
     def get_completion_handler(self, name: str) -> Callable: ...
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from sno_py.buffer import FileBuffer
 
@@ -12,6 +12,9 @@ class SnoEdit:
         self, buffer: Optional[FileBuffer] = ..., forced: bool = ...
     ) -> bool: ...
     async def create_file_buffer(self, path: str, encoding: str = ...) -> None: ...
+    async def create_file_buffers(
+        self, paths: List[str], encoding: str = ...
+    ) -> None: ...
     async def enter_command_mode(self) -> None: ...
     def get_buffer_index(
         self, path: Optional[str] = ..., display_name: Optional[str] = ...
@@ -20,4 +23,4 @@ class SnoEdit:
     async def process_command(self) -> None: ...
     def refresh_layout(self) -> None: ...
     async def run(self) -> None: ...
-    def save_all_buffers(self) -> None: ...
+    def save_all_buffers(self) -> bool: ...